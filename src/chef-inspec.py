@@ -9,8 +9,8 @@ More context on https://github.com/endoflife-date/endoflife.date/pull/4425#discu
 
 config = config_from_argv()
 with ProductData(config.product) as product_data:
-    html = http.fetch_html(config.url)
-    released_versions = [h2.get('id') for h2 in html.find_all('h2', id=True) if h2.get('id')]
+    html = http.fetch_html(config.url, features="html.parser")  # html5lib is very slow on this large page
+    released_versions = {h2.get('id') for h2 in html.find_all('h2', id=True) if h2.get('id')}
 
     for release in github.fetch_releases("inspec/inspec"):
         sanitized_version = release.tag_name.replace("v", "")
@@ -14,12 +14,14 @@ class Git:
         self.url: str = url
         self.repo_dir: Path = Path(f"~/.cache/git/{sha1(url.encode()).hexdigest()}").expanduser()
 
-    def _run(self, cmd: str) -> list:
+    def _run(self, *args: str) -> list:
         """Run git command and return command result as a list of lines.
+        Arguments are given as separate arguments and not interpreted by a shell, so they need no quoting.
         """
+        cmd = " ".join(args)
         try:
             logging.info(f"Running 'git {cmd}' on {self.url}")
-            child = run(f"git {cmd}", capture_output=True, timeout=300, check=True, shell=True, cwd=self.repo_dir)
+            child = run(["git", *args], capture_output=True, timeout=300, check=True, cwd=self.repo_dir)
             return child.stdout.decode("utf-8").strip().split("\n")
         except ChildProcessError as ex:
             msg = f"Failed to run '{cmd}': {ex}"
@@ -32,27 +34,26 @@ class Git:
         """
         if not Path(f"{self.repo_dir}").exists():
             self.repo_dir.mkdir(parents=True, exist_ok=True)
-            bare = "--bare" if bare else ""
-            self._run(f"init {bare}")
-            self._run(f"remote add origin {self.url}")
+            self._run("init", *(["--bare"] if bare else []))
+            self._run("remote", "add", "origin", self.url)
 
     # See https://stackoverflow.com/a/65746233/374236
     def list_tags(self) -> list[tuple[str, str]]:
         """Fetch and return tags matching the given`pattern`"""
         # See https://stackoverflow.com/a/65746233/374236
-        self._run("config --local extensions.partialClone true")
-        self._run(f"config --local http.userAgent '{http.ENDOFLIFE_BOT_USER_AGENT}'")
+        self._run("config", "--local", "extensions.partialClone", "true")
+        self._run("config", "--local", "http.userAgent", http.ENDOFLIFE_BOT_USER_AGENT)
         # Using --force to avoid error like "would clobber existing tag".
         # See https://stackoverflow.com/questions/58031165/how-to-get-rid-of-would-clobber-existing-tag.
-        self._run("fetch --force --tags --filter=blob:none --depth=1 origin")
-        tags_with_date = self._run("tag --list --format='%(refname:strip=2) %(creatordate:short)'")
+        self._run("fetch", "--force", "--tags", "--filter=blob:none", "--depth=1", "origin")
+        tags_with_date = self._run("tag", "--list", "--format=%(refname:strip=2) %(creatordate:short)")
         return [tag_with_date.split(" ") for tag_with_date in tags_with_date]
 
     def list_branches(self, pattern: str) -> list[str]:
         """Uses ls-remote to fetch the branch names
         `pattern` uses fnmatch style globbing
         """
-        lines = self._run(f"ls-remote origin '{pattern}'")
+        lines = self._run("ls-remote", "origin", pattern)
 
         # this checks keeps the linter quiet, because _run returns a bool OR list
         if isinstance(lines, bool):
@@ -67,6 +68,8 @@ class Git:
         """
         if file_list:
             # --skip-checks needed to avoid error when file_list contains a file
-            self._run(f"sparse-checkout set --skip-checks {' '.join(file_list)}")
-        self._run(f"fetch --filter=blob:none --depth 1 origin {branch}")
-        self._run(f"checkout {branch}")
+            self._run("sparse-checkout", "set", "--skip-checks", *file_list)
+        self._run("fetch", "--filter=blob:none", "--depth", "1", "origin", branch)
+        # Checkout what was just fetched: a plain 'checkout {branch}' would keep an existing (and outdated) local branch
+        # when the repository is restored from cache.
+        self._run("checkout", "--force", "-B", branch, "FETCH_HEAD")
@@ -7,6 +7,8 @@ from pathlib import Path
 from types import TracebackType
 from typing import Optional, Type
 
+import orjson
+
 from . import dates, endoflife
 
 SRC_DIR = Path('src')
@@ -150,11 +152,10 @@ class ProductData:
         logging.info("updating %s data", self.path)
         ordered_releases = sorted(self.releases.values(), key=lambda v: v.name(), reverse=True)
         ordered_versions = sorted(self.versions.values(), key=lambda v: (v.date(), v.name()), reverse=True)
-        with self.path.open("w") as f:
-            f.write(json.dumps({
-                "releases": {release.name(): release.data for release in ordered_releases},
-                "versions": {version.name(): version.data for version in ordered_versions},
-            }, indent=2))
+        self.path.write_bytes(orjson.dumps({
+            "releases": {release.name(): release.data for release in ordered_releases},
+            "versions": {version.name(): version.data for version in ordered_versions},
+        }, option=orjson.OPT_INDENT_2))
 
     def get_release(self, release_name: str) -> ProductRelease:
         release_name = endoflife.to_identifier(release_name)
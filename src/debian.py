@@ -1,5 +1,5 @@
+import re
 from pathlib import Path
-from subprocess import run
 
 from common import dates
 from common.git import Git
@@ -7,39 +7,38 @@ from common.releasedata import ProductData, config_from_argv
 
 """Fetch Debian versions by parsing news in www.debian.org source repository."""
 
+# Major release news look like:
+#   <define-tag pagetitle>Debian 12 <q>bookworm</q> released</define-tag>
+#   <define-tag release_date>2023-06-10</define-tag>
+MAJOR_RELEASE_PATTERN = re.compile(rb"<define-tag pagetitle>Debian ([0-9]+[^ <]*).+</q> released.*\n<define-tag release_date>([^<]+)<")
 
-def extract_major_versions(p: ProductData, repo_dir: Path) -> None:
-    child = run(
-        f"grep -RhE -A 1 '<define-tag pagetitle>Debian [0-9]+.+</q> released' {repo_dir}/english/News "
-        f"| cut -d '<' -f 2 "
-        f"| cut -d '>' -f 2 "
-        f"| grep -v -- '--'",
-        capture_output=True, timeout=300, check=True, shell=True)
-
-    is_release_line = True
-    version = None
-    for line in child.stdout.decode("utf-8").strip().split("\n"):
-        if is_release_line:
-            version = line.split(" ")[1]
-            is_release_line = False
-        else:
-            p.declare_version(version, dates.parse_date(line))
-            is_release_line = True
-
-
-def extract_point_versions(p: ProductData, repo_dir: Path) -> None:
-    child = run(
-        f"grep -Rh -B 10 '<define-tag revision>' {repo_dir}/english/News "
-        "| grep -Eo '(release_date>(.*)<|revision>(.*)<)' "
-        "| cut -d '>' -f 2,4 "
-        "| tr -d '<' "
-        "| sed 's/[[:space:]]+/ /' "
-        "| paste -d ' ' - -",
-        capture_output=True, timeout=300, check=True, shell=True)
-
-    for line in child.stdout.decode("utf-8").strip().split("\n"):
-        (date, version) = line.split(' ')
-        p.declare_version(version, dates.parse_date(date))
+# Point release news declare a release_date tag, followed a few lines later by a revision tag:
+#   <define-tag release_date>2023-07-22</define-tag>
+#   ...
+#   <define-tag revision>12.1</define-tag>
+POINT_RELEASE_TAG_PATTERN = re.compile(rb"<define-tag (release_date|revision)>([^<]+)<")
+
+
+def list_news(repo_dir: Path) -> list[bytes]:
+    return [news.read_bytes() for news in sorted((repo_dir / "english" / "News").rglob("*.wml"))]
+
+
+def extract_major_versions(p: ProductData, news: list[bytes]) -> None:
+    for content in news:
+        for match in MAJOR_RELEASE_PATTERN.finditer(content):
+            version = match.group(1).decode("utf-8")
+            p.declare_version(version, dates.parse_date(match.group(2).decode("utf-8").strip()))
+
+
+def extract_point_versions(p: ProductData, news: list[bytes]) -> None:
+    for content in news:
+        date = None
+        for match in POINT_RELEASE_TAG_PATTERN.finditer(content):
+            value = match.group(2).decode("utf-8").strip()
+            if match.group(1) == b"release_date":
+                date = value
+            elif date:
+                p.declare_version(value, dates.parse_date(date))
 
 config = config_from_argv()
 with ProductData(config.product) as product_data:
@@ -47,5 +46,6 @@ with ProductData(config.product) as product_data:
     git.setup()
     git.checkout("master", file_list=["english/News"])
 
-    extract_major_versions(product_data, git.repo_dir)
-    extract_point_versions(product_data, git.repo_dir)
+    all_news = list_news(git.repo_dir)
+    extract_major_versions(product_data, all_news)
+    extract_point_versions(product_data, all_news)
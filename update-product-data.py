@@ -1,17 +1,20 @@
 import argparse
 import datetime
-import json
+import functools
+import itertools
 import logging
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-import frontmatter
+import orjson
 from packaging.version import InvalidVersion, Version
 from ruamel.yaml import YAML, StringIO
+from ruamel.yaml.constructor import SafeConstructor
 from ruamel.yaml.representer import RoundTripRepresenter
 from ruamel.yaml.resolver import Resolver
 
-from src.common.dates import today_at_midnight
 from src.common.endoflife import list_products
 from src.common.gha import GitHubOutput
 from src.common.releasedata import DATA_DIR
@@ -23,25 +26,40 @@ _data/release-data and commits back the updated data.
 This is written in Python because the only package that supports writing back YAML with comments is ruamel
 """
 
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+FRONTMATTER_BOUNDARY = re.compile(r"^-{3,}\s*$", re.MULTILINE)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_version(version: str) -> Version:
+    """Parsing versions is costly and the same versions are compared over and over, so parsed versions are cached."""
+    return Version(version)
+
 
 class ReleaseCycle:
     def __init__(self, product: "Product", data: dict) -> None:
         self.product = product.name
         self.data = data
         self.name = data["releaseCycle"]
+        self.name_length = len(self.name)
         self.matched = False
         self.updated = False
+        self.updated_fields = {}
+
+    def set_field(self, key: str, value: any) -> None:
+        self.data[key] = value
+        self.updated_fields[key] = value
+        self.updated = True
 
     def update_with(self, release: dict) -> None:
         for key, value in release.items():
-            if isinstance(value, str) and re.fullmatch(r'^\d{4}-\d{2}-\d{2}$', value):
+            if isinstance(value, str) and DATE_PATTERN.fullmatch(value):
                 value = datetime.date.fromisoformat(value)
 
             old_value = self.data.get(key, None)
             if old_value != value:
                 logging.info(f"{self} {key} updated from {old_value} to {value} using release data")
-                self.data[key] = value
-                self.updated = True
+                self.set_field(key, value)
 
     def update_latest_with_version(self, version: str, date: datetime.date) -> None:
         logging.debug(f"will try to update {self} with {version} ({date})")
@@ -61,7 +79,7 @@ class ReleaseCycle:
 
         else:
             try:  # Do our best attempt at comparing the version numbers
-                if Version(old_latest) < Version(version):
+                if parse_version(old_latest) < parse_version(version):
                     logging.info(f"{self} latest updated from {old_latest} ({old_latest_date}) to {version} ({date}) using version data")
                     update_detected = True
             except InvalidVersion: # If we can't compare the version numbers, compare the dates
@@ -71,9 +89,8 @@ class ReleaseCycle:
                     update_detected = True
 
         if update_detected:
-            self.data["latest"] = version
-            self.data["latestReleaseDate"] = date
-            self.updated = True
+            self.set_field("latest", version)
+            self.set_field("latestReleaseDate", date)
 
     def release_date(self) -> datetime.date | None:
         return self.__as_date(self.data.get("releaseDate", None))
@@ -94,11 +111,8 @@ class ReleaseCycle:
         if not version.startswith(self.name):
             return False
 
-        if len(version) == len(self.name):  # exact match
-            return True
-
-        char_after_prefix = version[len(self.name)]
-        return not char_after_prefix.isdigit()
+        # exact match, or the char after prefix must not be a digit
+        return len(version) == self.name_length or not version[self.name_length].isdigit()
 
     def __str__(self) -> str:
         return self.product + '#' + self.name
@@ -117,29 +131,58 @@ class ReleaseCycle:
         return None
 
 
+class ReleaseCycleTrie:
+    """Prefix tree of release cycles, keyed on the release cycle names.
+    It allows finding the release cycles including a version while only walking the version characters once,
+    instead of checking the version against every release cycle of the product."""
+
+    def __init__(self, releases: list[ReleaseCycle]) -> None:
+        # Each node maps a character to its child node, releases ending at a node are stored under the None key.
+        self.root: dict = {}
+        for release in releases:
+            node = self.root
+            for char in release.name:
+                node = node.setdefault(char, {})
+            node.setdefault(None, []).append(release)
+
+    def releases_including(self, version: str) -> list[ReleaseCycle]:
+        releases = []
+        node = self.root
+        for char in version:
+            if None in node:  # only check the boundary when there are release cycles ending here
+                releases.extend(release for release in node[None] if release.includes(version))
+            node = node.get(char)
+            if node is None:
+                return releases
+
+        releases.extend(node.get(None, []))  # exact matches
+        return releases
+
+
 class Product:
     def __init__(self, name: str, product_dir: Path, versions_dir: Path) -> None:
         self.name = name
         self.product_path = product_dir / f"{name}.md"
         self.release_data_path = versions_dir / f"{name}.json"
 
-        with self.product_path.open() as product_file:
-            # First read the frontmatter of the product file.
-            yaml = YAML()
-            yaml.preserve_quotes = True
-            self.data = next(yaml.load_all(product_file))
-
-            # Now read the content of the product file
-            product_file.seek(0)
-            _, self.content = frontmatter.parse(product_file.read())
-
-        if self.release_data_path.exists():
-            with self.release_data_path.open() as release_data_file:
-                self.release_data = json.loads(release_data_file.read())
+        # Read the product file once and split it. The frontmatter is parsed with the (fast) ruamel safe loader, backed
+        # by ruamel.yaml.clib, which resolves scalars the same way as the round-trip loader. The (slow) round-trip
+        # parsing, which preserves comments and formatting, is only done in write().
+        product_text = self.product_path.read_text()
+        _, frontmatter_text, content = FRONTMATTER_BOUNDARY.split(product_text.strip(), 2)
+        # Trailing blank lines would be kept by ruamel when dumping, and added to the ones write() adds.
+        self.frontmatter_text = frontmatter_text.rstrip() + "\n"
+        self.data = YAML(typ="safe").load(self.frontmatter_text)
+        self.content = content.strip()
+
+        # Release data is only generated for products with auto configs (see ProductFrontmatter.has_auto_configs).
+        if "methods" in self.data.get("auto", {}) and self.release_data_path.exists():
+            self.release_data = orjson.loads(self.release_data_path.read_bytes())
         else:
             self.release_data = None
 
         self.releases = [ReleaseCycle(self, release) for release in self.data["releases"]]
+        self.releases_trie = ReleaseCycleTrie(self.releases)
         self.updated = False
         self.unmatched_releases = {}
         self.unmatched_versions = {}
@@ -147,7 +190,7 @@ class Product:
     # Placeholder function for mass-upgrading the structure of the product files.
     def upgrade_structure(self) -> None:
         logging.debug(f"upgrading {self.name} structure")
-        # Do not forget to set self.updated to True
+        # Do not forget to set self.updated to True, and to apply the changes on the round-trip data in write()
 
     def check_latest(self) -> None:
         for release in self.releases:
@@ -173,28 +216,35 @@ class Product:
         date = datetime.date.fromisoformat(version_data["date"])
 
         version_matched = False
-        for release in self.releases:
-            if release.includes(name):
-                version_matched = True
-                release.update_latest_with_version(name, date)
-                self.updated = self.updated or release.updated
+        for release in self.releases_trie.releases_including(name):
+            version_matched = True
+            release.update_latest_with_version(name, date)
+            self.updated = self.updated or release.updated
 
         if not version_matched:
             self.unmatched_versions[name] = date
 
     def write(self) -> None:
-        with self.product_path.open("w") as product_file:
-            product_file.truncate()
-            product_file.write("---\n")
+        # Parse the frontmatter again with ruamel to preserve comments and formatting, and apply the updates on it.
+        yaml_frontmatter = YAML()
+        yaml_frontmatter.preserve_quotes = True
+        data = yaml_frontmatter.load(self.frontmatter_text)
+        for release, release_data in zip(self.releases, data["releases"], strict=True):
+            for key, value in release.updated_fields.items():
+                release_data[key] = value
 
-            yaml_frontmatter = YAML()
-            yaml_frontmatter.width = 4096  # prevent line-wrap
-            yaml_frontmatter.indent(sequence=4, offset=2)
-            yaml_frontmatter.dump(self.data, product_file)
+        # Build the whole file in memory so that it is written at once.
+        product_text = StringIO()
+        product_text.write("---\n")
 
-            product_file.write("\n---\n\n")
-            product_file.write(self.content)
-            product_file.write("\n")
+        yaml_frontmatter.width = 4096  # prevent line-wrap
+        yaml_frontmatter.indent(sequence=4, offset=2)
+        yaml_frontmatter.dump(data, product_text)
+
+        product_text.write("\n---\n\n")
+        product_text.write(self.content)
+        product_text.write("\n")
+        self.product_path.write_text(product_text.getvalue())
 
 
 def update_product(name: str, product_dir: Path, releases_dir: Path, output: GitHubOutput) -> None:
@@ -219,7 +269,7 @@ def update_product(name: str, product_dir: Path, releases_dir: Path, output: Git
     today = datetime.datetime.now(tz=datetime.timezone.utc).date()
     __raise_alert_for_unmatched_versions(name, output, product, today, 30)
     __raise_alert_for_unmatched_releases(name, output, product)
-    __raise_alert_for_stale_releases(name, output, product)
+    __raise_alert_for_stale_releases(name, output, product, today)
 
 
 def __raise_alert_for_unmatched_versions(name: str, output: GitHubOutput, product: Product, today: datetime.date,
@@ -257,7 +307,7 @@ def __raise_alert_for_unmatched_releases(name: str, output: GitHubOutput, produc
     __print_unmatched_releases_as_yaml(product)
 
 
-def __raise_alert_for_stale_releases(name: str, output: GitHubOutput, product: Product) -> None:
+def __raise_alert_for_stale_releases(name: str, output: GitHubOutput, product: Product, today: datetime.date) -> None:
     global_threshold = product.data.get("staleReleaseThresholdDays", 365)
 
     for release in product.releases:
@@ -274,13 +324,13 @@ def __raise_alert_for_stale_releases(name: str, output: GitHubOutput, product: P
 
         latest_release_date = release.latest_release_date()
         if latest_release_date:
-            days_since_latest = (today_at_midnight().date() - latest_release_date).days
+            days_since_latest = (today - latest_release_date).days
             if days_since_latest > threshold:
                 __raise_alert(f"{name}:{release.name} is not EOL and has not had a version in {days_since_latest} days", output)
             continue
 
         release_date = release.release_date()
-        days_since_release = (today_at_midnight().date() - release_date).days
+        days_since_release = (today - release_date).days
         if days_since_release > threshold:
             __raise_alert(f"{name}:{release.name} is not EOL and is {days_since_release} days old", output)
 
@@ -289,28 +339,50 @@ def __raise_alert(message: str, output: GitHubOutput) -> None:
     logging.warning(message)
     output.println(message)
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Update product releases.')
-    parser.add_argument('product', nargs='?', help='restrict update to the given product')
-    parser.add_argument('-p', '--product-dir', required=True, help='path to the product directory')
-    parser.add_argument('-v', '--verbose', action='store_true', help='enable verbose logging')
-    args = parser.parse_args()
 
-    logging.basicConfig(format=logging.BASIC_FORMAT, level=(logging.DEBUG if args.verbose else logging.INFO))
+def update_product_and_collect_alerts(name: str, product_dir: Path, releases_dir: Path) -> list[str]:
+    logging.debug(f"Processing {name}")
+    output = GitHubOutput("warning")  # only used to collect alerts, never written to GITHUB_OUTPUT
+    update_product(name, product_dir, releases_dir, output)
+    return output.value.splitlines()
+
+
+def configure(verbose: bool) -> None:
+    """Configure logging and YAML, must be called by the main process and every worker process."""
+    logging.basicConfig(format=logging.BASIC_FORMAT, level=(logging.DEBUG if verbose else logging.INFO))
 
     # Force YAML to format version numbers as strings, see https://stackoverflow.com/a/71329221/368328.
     Resolver.add_implicit_resolver("tag:yaml.org,2002:string", re.compile(r"\d+(\.\d+){0,3}", re.X), list(".0123456789"))
+    SafeConstructor.add_constructor("tag:yaml.org,2002:string", SafeConstructor.construct_yaml_str)
 
     # Force ruamel to never use aliases when dumping, see https://stackoverflow.com/a/64717341/374236.
     # Example of dumping with aliases: https://github.com/endoflife-date/endoflife.date/pull/4368.
     RoundTripRepresenter.ignore_aliases = lambda x, y: True # NOQA: ARG005
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Update product releases.')
+    parser.add_argument('product', nargs='?', help='restrict update to the given product')
+    parser.add_argument('-p', '--product-dir', required=True, help='path to the product directory')
+    parser.add_argument('-v', '--verbose', action='store_true', help='enable verbose logging')
+    args = parser.parse_args()
+
+    configure(args.verbose)
+
     products_dir = Path(args.product_dir)
     data_dir = Path(__file__).resolve().parent / DATA_DIR
     products = list_products(products_dir, args.product)
 
     github_output = GitHubOutput("warning")
     with github_output:
-        for product in products:
-            logging.debug(f"Processing {product.name}")
-            update_product(product.name, products_dir, data_dir, github_output)
+        if len(products) == 1:
+            products_alerts = [update_product_and_collect_alerts(products[0].name, products_dir, data_dir)]
+        else:
+            # Products are independent from each other, and their update is CPU-bound (YAML and version parsing).
+            # Alerts are collected in each process and then printed in order by the main process.
+            with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=configure, initargs=(args.verbose,)) as executor:
+                futures = [executor.submit(update_product_and_collect_alerts, product.name, products_dir, data_dir)
+                           for product in products]
+                products_alerts = [future.result() for future in futures]
+
+        for alert in itertools.chain.from_iterable(products_alerts):
+            github_output.println(alert)